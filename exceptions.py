@@ -13,4 +13,8 @@ class ParseNoneStatus(Exception):
 
 
 class TelegramBot(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class ApiUnavailable(ApiError):
+    """Класс исключений при временной недоступности API"""
+    pass
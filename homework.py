@@ -1,67 +1,271 @@
+import atexit
+import json
 import logging
+import operator
 import os
+import queue
+import signal
 import sys
+import threading
 import time
+from collections import OrderedDict
 from http import HTTPStatus
-from typing import Union
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 import requests
 import telegram
 from dotenv import load_dotenv
 
-from exceptions import ApiError, TokenError, ParseNoneStatus, TelegramBot
+from exceptions import (ApiError, ApiUnavailable, ParseNoneStatus,
+                        TelegramBot, TokenError)
 
 load_dotenv()
 
-logging.basicConfig(
-    datefmt="%H:%M:%S",
-    filename="main.log",
-    encoding="UTF-8",
-    filemode="a",
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(funcName)s - %(message)s'
-)
+LOG_FILE = "main.log"
+
+file_handler = logging.FileHandler(LOG_FILE, mode="a", encoding="UTF-8")
+file_handler.setFormatter(logging.Formatter(
+    '%(asctime)s [%(levelname)s] %(funcName)s - %(message)s',
+    datefmt="%H:%M:%S"
+))
 
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 handler = logging.StreamHandler(stream=sys.stdout)
 formatter = logging.Formatter(
     "%(asctime)s [%(levelname)s] %(message)s (%(funcName)s | %(lineno)d)"
 )
 handler.setFormatter(formatter)
-logger.addHandler(handler)
+handler.addFilter(logging.Filter(__name__))
+
+log_queue: queue.Queue = queue.Queue(-1)
+logging.root.addHandler(QueueHandler(log_queue))
+logging.root.setLevel(logging.INFO)
+listener = QueueListener(log_queue, file_handler, handler)
+listener.start()
+atexit.register(listener.stop)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
 
 PRACTICUM_TOKEN = os.getenv("PRACTICUM_TOKEN")
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+_REQUIRED_TOKENS = ("PRACTICUM_TOKEN", "TELEGRAM_TOKEN", "TELEGRAM_CHAT_ID")
 
 RETRY_TIME = 600
+FAST_RETRY_TIME = 30
+RETRY_BACKOFF = 1.5
 ENDPOINT = "https://practicum.yandex.ru/api/user_api/homework_statuses/"
-HEADERS = {"Authorization": f"OAuth {PRACTICUM_TOKEN}"}
+API_TIMEOUT = (3.05, 27)
+API_RETRY_TOTAL = 3
+API_RETRY_BACKOFF = 0.5
+API_RETRY_STATUSES = frozenset((
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+))
+CACHE_TTL = 60
+CACHE_MAX_AGE = 1800
+
+_CACHE: Dict[Union[int, float], Tuple[float, dict]] = {}
+
+BATCH_FLUSH = 3
+BATCH_SEPARATOR = "\n---\n"
+MESSAGE_MAX_LENGTH = 4096
+SEND_RETRY_TOTAL = 3
+SEND_RETRY_BACKOFF = 1
+
+_OUT_Q: queue.Queue = queue.Queue(maxsize=1024)
+_sender: Optional[threading.Thread] = None
+
+LAST_STATUS_FILE = os.path.join(os.path.dirname(os.path.abspath(LOG_FILE)),
+                                "last_status.json")
+LAST_STATUS_MAX_SIZE = 256
+
+SHUTDOWN_TIMEOUT = 10
+STATUS_LOCK_TIMEOUT = 1
+
+_LAST_STATUS: "OrderedDict[str, str]" = OrderedDict()
+_PENDING_STATUS: Set[Tuple[str, str]] = set()
+_STATUS_LOCK = threading.Lock()
+
+NOTIFY_ONCE = "once"
+ERROR_HANDLERS = {
+    ParseNoneStatus: ("Сбой в работе, недокументированный статус домашней "
+                      "работы, обнаруженный в ответе API:", True),
+    TokenError: ("Отсутствие ожидаемых ключей от API:", True),
+    ApiError: ("Нет доступа к API:", NOTIFY_ONCE),
+    TelegramBot: ("Возникла ошибка с отправкой сообщения:", False),
+}
+DEFAULT_ERROR_HANDLER = ("Сбой в работе программы:", True)
 
-HOMEWORK_STATUSES = {
+HOMEWORK_STATUSES = {sys.intern(status): verdict for status, verdict in {
     "approved": "Работа проверена: ревьюеру всё понравилось. Ура!",
     "reviewing": "Работа взята на проверку ревьюером.",
     "rejected": "Работа проверена: у ревьюера есть замечания.",
-}
+}.items()}
+_GET_FIELDS = operator.itemgetter("homework_name", "status")
+_STATUS_TEMPLATE = 'Изменился статус проверки работы "{}". {}'.format
 
 
 def send_message(bot: telegram, message: str):
-    """Функция отправляет сообщения в Telegram чат.
+    """Функция ставит сообщение в очередь на отправку в Telegram чат.
 
-    Отправляет сообщение в Telegram чат, определяемый
-    переменной окружения TELEGRAM_CHAT_ID
+    Сообщения отправляет фоновый поток: за BATCH_FLUSH секунд он собирает
+    накопившиеся сообщения и отправляет их одним сообщением в чат,
+    определяемый переменной окружения TELEGRAM_CHAT_ID
 
     :param bot: экземпляр класса Bot
     :type bot: telegram.Bot
     :param message: Строка с текстом сообщения
     :type message: str
+
+    :raises TelegramBot: Очередь отправки переполнена
     """
-    try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
-        logging.info("Сообщение успешно отправлено")
-    except Exception as send_message_error:
-        raise TelegramBot('Ошибка отправки сообщения', send_message_error)
+    queue_message(bot, message)
+
+
+def queue_message(bot: telegram, message: str,
+                  reported: Optional[Tuple[str, str]] = None):
+    """Ставит сообщение в очередь отправки.
+
+    Сообщение длиннее MESSAGE_MAX_LENGTH ставится в очередь частями.
+    Если передан reported — пара (название работы, статус), — статус
+    считается ожидающим и отмечается сообщенным после доставки
+    последней части.
+
+    :param bot: экземпляр класса Bot
+    :type bot: telegram.Bot
+    :param message: Строка с текстом сообщения
+    :type message: str
+    :param reported: Статус работы, о котором сообщает сообщение
+    :type reported: tuple
+
+    :raises TelegramBot: Очередь отправки переполнена
+    """
+    global _sender
+    if not message:
+        return
+    if _sender is None or not _sender.is_alive():
+        _sender = threading.Thread(target=_send_batches, args=(bot,),
+                                   name="telegram-sender", daemon=True)
+        _sender.start()
+    chunks = [message[start:start + MESSAGE_MAX_LENGTH]
+              for start in range(0, len(message), MESSAGE_MAX_LENGTH)]
+    if _OUT_Q.maxsize and _OUT_Q.maxsize - _OUT_Q.qsize() < len(chunks):
+        raise TelegramBot('Очередь отправки переполнена')
+    if reported is not None:
+        with _STATUS_LOCK:
+            _PENDING_STATUS.add(reported)
+    for chunk in chunks[:-1]:
+        _OUT_Q.put_nowait((chunk, None))
+    _OUT_Q.put_nowait((chunks[-1], reported))
+
+
+def _send_batches(bot: telegram):
+    """Фоновый цикл отправки сообщений из очереди в Telegram чат.
+
+    Пачки отправляются по порядку. Если пачку не удалось отправить,
+    она и все следующие остаются в работе: новые сообщения из очереди
+    не забираются, пока они не доставлены, поэтому при долгом сбое
+    очередь заполняется и send_message выбрасывает TelegramBot.
+    После доставки статусы работ отмечаются сообщенными.
+
+    :param bot: экземпляр класса Bot
+    :type bot: telegram.Bot
+    """
+    unsent = []
+    while True:
+        if unsent:
+            time.sleep(BATCH_FLUSH)
+            items = unsent
+        else:
+            items = [_OUT_Q.get()]
+            deadline = time.monotonic() + BATCH_FLUSH
+            while (len(items) < _OUT_Q.maxsize
+                   and (timeout := deadline - time.monotonic()) > 0):
+                try:
+                    items.append(_OUT_Q.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+        unsent = _send_items(bot, items)
+
+
+def _send_items(bot: telegram, items: List[Tuple[str, Optional[tuple]]]
+                ) -> List[Tuple[str, Optional[tuple]]]:
+    """Отправляет элементы очереди пачками по порядку.
+
+    :param bot: экземпляр класса Bot
+    :type bot: telegram.Bot
+    :param items: Пары (текст, статус работы) из очереди отправки
+    :type items: list
+
+    :return: Элементы начиная с первой неотправленной пачки
+    :rtype: list
+    """
+    position = 0
+    for group in _split_batch([message for message, _ in items]):
+        if not _send_chunk(bot, BATCH_SEPARATOR.join(group)):
+            return items[position:]
+        for _, reported in items[position:position + len(group)]:
+            if reported is not None:
+                mark_reported(reported)
+            _OUT_Q.task_done()
+        position += len(group)
+    return []
+
+
+def _split_batch(messages: List[str]) -> List[List[str]]:
+    """Группирует сообщения для отправки одним сообщением Telegram.
+
+    Склеенный текст группы не длиннее MESSAGE_MAX_LENGTH.
+
+    :param messages: Список сообщений не длиннее MESSAGE_MAX_LENGTH
+    :type messages: list
+
+    :return: Список групп сообщений
+    :rtype: list
+    """
+    groups = []
+    length = 0
+    for message in messages:
+        extra = len(BATCH_SEPARATOR) + len(message)
+        if groups and length + extra <= MESSAGE_MAX_LENGTH:
+            groups[-1].append(message)
+            length += extra
+        else:
+            groups.append([message])
+            length = len(message)
+    return groups
+
+
+def _send_chunk(bot: telegram, text: str) -> bool:
+    """Отправляет одно сообщение в Telegram чат с повторами.
+
+    При ошибке отправка повторяется до SEND_RETRY_TOTAL раз
+    с экспоненциальной паузой.
+
+    :param bot: экземпляр класса Bot
+    :type bot: telegram.Bot
+    :param text: Текст сообщения не длиннее MESSAGE_MAX_LENGTH
+    :type text: str
+
+    :return: True, если сообщение отправлено
+    :rtype: bool
+    """
+    for attempt in range(SEND_RETRY_TOTAL + 1):
+        try:
+            bot.send_message(TELEGRAM_CHAT_ID, text)
+        except Exception as send_message_error:
+            logger.error(f"Ошибка отправки сообщения: {send_message_error}")
+            if attempt == SEND_RETRY_TOTAL:
+                return False
+            time.sleep(SEND_RETRY_BACKOFF * 2 ** attempt)
+        else:
+            logging.info("Сообщение успешно отправлено")
+            return True
 
 
 def get_api_answer(current_timestamp: int) -> dict:
@@ -69,6 +273,10 @@ def get_api_answer(current_timestamp: int) -> dict:
 
     Функция get_api_answer() делает запрос к единственному эндпоинту
     API-сервиса. В качестве параметра функция получает временную метку.
+    Ответ кэшируется на CACHE_TTL секунд по значению from_date. Если API
+    временно недоступно, возвращается последний сохраненный ответ, если он
+    относится к этой метке или заканчивается на ней и получен не более
+    CACHE_MAX_AGE секунд назад.
 
     :param current_timestamp: unitime - временная метка
     :type current_timestamp: int
@@ -76,6 +284,8 @@ def get_api_answer(current_timestamp: int) -> dict:
     типам данных Python.
     :rtype: dict
 
+    :raises ApiUnavailable: API временно недоступно, а подходящего
+    сохраненного ответа нет
     :raises ApiError: Возникает ошибка при ошибках обращения к API
     """
     if type(current_timestamp) != int and type(current_timestamp) != float:
@@ -86,19 +296,71 @@ def get_api_answer(current_timestamp: int) -> dict:
     else:
         timestamp = current_timestamp
 
+    entry = _CACHE.get(timestamp)
+    if entry and time.monotonic() - entry[0] < CACHE_TTL:
+        logger.debug(f'Ответ API для from_date={timestamp} взят из кэша')
+        return entry[1]
+
+    try:
+        homework_statuses = _request_api(timestamp)
+    except ApiUnavailable as api_error:
+        fallback = _fallback_answer(timestamp)
+        if fallback is None:
+            raise
+        logger.warning(f'API недоступно ({api_error}), использую '
+                       f'последний сохраненный ответ')
+        return fallback
+
+    _CACHE.clear()
+    _CACHE[timestamp] = (time.monotonic(), homework_statuses)
+    return homework_statuses
+
+
+def _fallback_answer(timestamp: Union[int, float]) -> Optional[dict]:
+    """Возвращает сохраненный ответ API, пригодный для временной метки.
+
+    Подходит ответ на запрос с той же меткой или ответ, чей current_date
+    равен метке, то есть предыдущий ответ в цепочке опроса из main().
+    Ответы старше CACHE_MAX_AGE секунд не используются.
+
+    :param timestamp: unitime - временная метка
+    :type timestamp: int
+    :return: сохраненный ответ API или None
+    :rtype: dict
+    """
+    for cached_timestamp, (stored_at, body) in _CACHE.items():
+        if time.monotonic() - stored_at > CACHE_MAX_AGE:
+            continue
+        if cached_timestamp == timestamp or (
+                isinstance(body, dict)
+                and body.get("current_date") == timestamp):
+            return body
+    return None
+
+
+def _request_api(timestamp: Union[int, float]) -> dict:
+    """Выполняет HTTP-запрос к эндпоинту API-сервиса.
+
+    :param timestamp: unitime - временная метка
+    :type timestamp: int
+    :return: ответ API, преобразованный из формата JSON.
+    :rtype: dict
+
+    :raises ApiUnavailable: Ошибка соединения, тайм-аут или код ответа
+    из API_RETRY_STATUSES
+    :raises ApiError: Возникает ошибка при ошибках обращения к API
+    """
     params = {"from_date": timestamp}
 
     try:
-        homework_statuses = requests.get(ENDPOINT,
-                                         headers=HEADERS,
-                                         params=params)
+        homework_statuses = _get_with_retry(params)
         homework_status_code = homework_statuses.status_code
         if homework_status_code != HTTPStatus.OK:
             if homework_status_code == HTTPStatus.UNAUTHORIZED:
                 homework_statuses = homework_statuses.json()
                 homework_status_request = (homework_statuses.get(
                     'code') or homework_statuses.get('error'))
-                print(homework_statuses)
+                logger.debug(f'Ответ API: {homework_statuses}')
                 raise ApiError(f'Обнаружена ошибка возвращаемая API: '
                                f'{homework_status_request} - '
                                f'{homework_statuses.get("message")}, '
@@ -106,23 +368,28 @@ def get_api_answer(current_timestamp: int) -> dict:
                                f'Эндпоинт: {ENDPOINT}, Параметры: {params}'
                                )
             else:
-                raise ApiError(f'Ошибка: {homework_statuses.status_code}',
-                               HTTPStatus(
-                                   homework_statuses.status_code).description,
-                               f'Эндпоинт: {ENDPOINT}, Параметры: {params}')
+                error_class = (ApiUnavailable
+                               if homework_status_code in API_RETRY_STATUSES
+                               else ApiError)
+                raise error_class(
+                    f'Ошибка: {homework_status_code}',
+                    HTTPStatus(homework_status_code).description,
+                    f'Эндпоинт: {ENDPOINT}, Параметры: {params}')
         else:
             homework_statuses = homework_statuses.json()
     except requests.ConnectionError as e:
         error_message = (
             "OOPS!! ошибка соединения. Убедитесь, что вы подключены к "
             "Интернету. Технические подробности приведены ниже.\n", e)
-        raise ApiError(error_message)
+        raise ApiUnavailable(error_message)
     except requests.Timeout as e:
         error_message = ("OOPS!! Ошибка тайм-аута", e)
-        raise ApiError(error_message)
+        raise ApiUnavailable(error_message)
     except requests.RequestException as e:
         error_message = ("OOPS!! General Error", e)
         raise ApiError(error_message)
+    except ApiError:
+        raise
     except KeyboardInterrupt:
         error_message = "Кто-то закрыл программу"
         raise ApiError(error_message)
@@ -133,6 +400,37 @@ def get_api_answer(current_timestamp: int) -> dict:
         return homework_statuses
 
 
+def _get_with_retry(params: dict) -> requests.Response:
+    """Выполняет GET-запрос к ENDPOINT с повторами.
+
+    Заголовок авторизации строится из текущего PRACTICUM_TOKEN.
+    При ошибках соединения, тайм-ауте и кодах из API_RETRY_STATUSES
+    запрос повторяется до API_RETRY_TOTAL раз с экспоненциальной паузой.
+
+    :param params: Параметры запроса
+    :type params: dict
+    :return: Ответ сервера последней попытки
+    :rtype: requests.Response
+    """
+    headers = {"Authorization": f"OAuth {PRACTICUM_TOKEN}"}
+    for attempt in range(API_RETRY_TOTAL + 1):
+        try:
+            response = requests.get(ENDPOINT,
+                                    headers=headers,
+                                    params=params,
+                                    timeout=API_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == API_RETRY_TOTAL:
+                raise
+        else:
+            if (response.status_code not in API_RETRY_STATUSES
+                    or attempt == API_RETRY_TOTAL):
+                return response
+        delay = API_RETRY_BACKOFF * 2 ** attempt
+        logger.warning(f'Повтор запроса к API через {delay} с')
+        time.sleep(delay)
+
+
 def check_response(response) -> Union[bool, dict]:
     """Проверка API на корректность.
 
@@ -147,41 +445,142 @@ def check_response(response) -> Union[bool, dict]:
     :return: Возвратит список домашних работ.
     :rtype: dict
 
+    :raises TypeError: Ответ API не является словарем
     :raises TokenError: Ошибка в случае некорректности ответа API
     """
-    if not response['homeworks']:
-        return False
-    elif type(response["homeworks"]) != list:
-        raise TokenError
-    else:
-        return response["homeworks"]
+    if not isinstance(response, dict):
+        raise TypeError(f'Ответ API имеет тип {type(response).__name__}, '
+                        f'ожидался dict')
+    homeworks = response.get("homeworks")
+    if not isinstance(homeworks, list):
+        raise TokenError("homeworks")
+    return homeworks or False
 
 
-def parse_status(homework: dict) -> Union[bool, str]:
+def parse_status(homework: dict) -> str:
     """Функция извлекает информацию о конкретной домашней работе.
 
 
     :param homework: Один элемент из списка домашних работ.
     :type homework: dict
 
-    :return: В случае корректности возвращается сообщение, иначе
-    булевое значение
-    :rtype: bool|str
+    :return: Сообщение об изменении статуса
+    :rtype: str
 
+    :raises KeyError: Нет ключа homework_name или status
     :raises ParseNoneStatus: Недокументированный статус домашней работы
     """
-    if homework:
-        homework_name = homework["homework_name"]
-        homework_status = homework["status"]
-    else:
-        return False
+    homework_name, homework_status = _GET_FIELDS(homework)
+
+    if not isinstance(homework_status, str):
+        raise ParseNoneStatus(homework_status)
+
+    verdict = HOMEWORK_STATUSES.get(sys.intern(homework_status))
+    if verdict is None:
+        raise ParseNoneStatus(homework_status)
+
+    return _STATUS_TEMPLATE(homework_name, verdict)
+
+
+def is_new_status(homework: dict) -> bool:
+    """Функция проверяет, изменился ли статус домашней работы.
+
+    Статус считается новым, если о нем еще не сообщали и сообщение
+    о нем не ждет отправки в очереди.
+
+    :param homework: Один элемент из списка домашних работ.
+    :type homework: dict
 
+    :return: True, если о статусе еще не сообщали
+    :rtype: bool
+    """
+    homework_name, homework_status = _GET_FIELDS(homework)
+    with _STATUS_LOCK:
+        if (homework_name, homework_status) in _PENDING_STATUS:
+            return False
+        if _LAST_STATUS.get(homework_name) == homework_status:
+            _LAST_STATUS.move_to_end(homework_name)
+            return False
+    return True
+
+
+def mark_reported(reported: Tuple[str, str]):
+    """Отмечает статус домашней работы как сообщенный.
+
+    Хранит последние LAST_STATUS_MAX_SIZE статусов.
+
+    :param reported: Пара (название работы, статус)
+    :type reported: tuple
+    """
+    homework_name, homework_status = reported
+    with _STATUS_LOCK:
+        _PENDING_STATUS.discard(reported)
+        _LAST_STATUS[homework_name] = homework_status
+        _LAST_STATUS.move_to_end(homework_name)
+        if len(_LAST_STATUS) > LAST_STATUS_MAX_SIZE:
+            _LAST_STATUS.popitem(last=False)
+
+
+def load_last_status():
+    """Загружает сохраненные статусы домашних работ из LAST_STATUS_FILE."""
+    try:
+        with open(LAST_STATUS_FILE, encoding="UTF-8") as status_file:
+            _LAST_STATUS.update(json.load(status_file))
+    except FileNotFoundError:
+        pass
+    except (OSError, TypeError, ValueError) as load_error:
+        logger.error(f"Не удалось загрузить {LAST_STATUS_FILE}: {load_error}")
+
+
+def save_last_status(signum=None, frame=None):
+    """Сохраняет статусы домашних работ в LAST_STATUS_FILE.
+
+    Используется как обработчик SIGTERM: сначала до SHUTDOWN_TIMEOUT
+    секунд ждет отправки сообщений из очереди, после сохранения
+    завершает программу.
+    """
+    if signum is not None:
+        _drain_outbox(SHUTDOWN_TIMEOUT)
     try:
-        verdict = HOMEWORK_STATUSES[homework_status]
-    except KeyError:
-        raise ParseNoneStatus
+        snapshot = _status_snapshot()
+        with open(LAST_STATUS_FILE, "w", encoding="UTF-8") as status_file:
+            json.dump(snapshot, status_file, ensure_ascii=False)
+    except OSError as save_error:
+        logger.error(f"Не удалось сохранить {LAST_STATUS_FILE}: {save_error}")
+    if signum is not None:
+        sys.exit()
+
 
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+def _status_snapshot() -> Dict[str, str]:
+    """Возвращает копию сохраненных статусов домашних работ.
+
+    _LAST_STATUS меняется только под _STATUS_LOCK. Если блокировку не
+    удалось получить за STATUS_LOCK_TIMEOUT секунд, ее держит основной
+    поток, прерванный сигналом, и словарь тоже никто не меняет.
+
+    :return: Копия _LAST_STATUS
+    :rtype: dict
+    """
+    acquired = _STATUS_LOCK.acquire(timeout=STATUS_LOCK_TIMEOUT)
+    try:
+        return dict(_LAST_STATUS)
+    finally:
+        if acquired:
+            _STATUS_LOCK.release()
+
+
+def _drain_outbox(timeout: float):
+    """Ждет, пока фоновый поток отправит сообщения из очереди.
+
+    :param timeout: Максимальное время ожидания в секундах
+    :type timeout: float
+    """
+    deadline = time.monotonic() + timeout
+    while (_OUT_Q.unfinished_tasks and _sender is not None
+           and _sender.is_alive() and time.monotonic() < deadline):
+        time.sleep(0.1)
+    if _OUT_Q.unfinished_tasks:
+        logger.error(f"Не отправлено сообщений: {_OUT_Q.unfinished_tasks}")
 
 
 def check_tokens() -> bool:
@@ -190,27 +589,96 @@ def check_tokens() -> bool:
     Функция проверяет доступность переменных с токенами в файле .evn
     при его отсутствии, требуется создать, пример в .evn.example.
 
-    :return: если все переменные - возвращает True
+    :return: если все переменные - возвращает True, иначе False
+    :rtype: bool
+    """
+    for token_name in _REQUIRED_TOKENS:
+        token = globals()[token_name]
+        if not token or len(str(token)) <= 1:
+            logger.critical(
+                f"Отсутствует обязательная переменная: {token_name}.")
+            return False
+    return True
+
+
+def get_next_sleep(previous_sleep: float, updated: bool) -> float:
+    """Функция вычисляет паузу до следующего запроса к API.
+
+    :param previous_sleep: Предыдущая пауза в секундах
+    :type previous_sleep: float
+    :param updated: Были ли новые статусы в последнем ответе
+    :type updated: bool
+
+    :return: FAST_RETRY_TIME после обновления, иначе предыдущая пауза,
+    увеличенная в RETRY_BACKOFF раз, но не больше RETRY_TIME
+    :rtype: float
+    """
+    if updated:
+        return FAST_RETRY_TIME
+    return min(previous_sleep * RETRY_BACKOFF, RETRY_TIME)
+
+
+def send_new_statuses(bot: telegram, homeworks: List[dict],
+                      notified_errors: set) -> bool:
+    """Отправляет сообщения о новых статусах домашних работ.
+
+    Ошибка разбора одной работы передается в handle_error, остальные
+    работы обрабатываются дальше.
+
+    :param bot: экземпляр класса Bot
+    :type bot: telegram.Bot
+    :param homeworks: Список домашних работ из ответа API
+    :type homeworks: list
+    :param notified_errors: Типы ошибок, о которых уже сообщали
+    :type notified_errors: set
+
+    :return: True, если было отправлено хотя бы одно сообщение
     :rtype: bool
+    """
+    updated = False
+    for homework in homeworks:
+        try:
+            status_homework = parse_status(homework)
+        except (KeyError, TypeError, ParseNoneStatus) as parse_error:
+            handle_error(bot, parse_error, notified_errors)
+            continue
+        if not is_new_status(homework):
+            logger.debug("Статус уже был отправлен")
+            continue
+        queue_message(bot, status_homework, _GET_FIELDS(homework))
+        logger.info("Сообщение с новым статусом поставлено в очередь")
+        updated = True
+    return updated
+
+
+def handle_error(bot: telegram, error: Exception, notified_errors: set):
+    """Логирует ошибку основного цикла и при необходимости сообщает о ней.
+
+    Текст и правило отправки берутся из ERROR_HANDLERS по ближайшему
+    классу ошибки в ее MRO, так что подклассы наследуют правило базового
+    класса; для остальных ошибок — из DEFAULT_ERROR_HANDLER.
 
-    :raises TokenError: Отсутствие обязательной переменной
+    :param bot: экземпляр класса Bot
+    :type bot: telegram.Bot
+    :param error: Перехваченная ошибка
+    :type error: Exception
+    :param notified_errors: Классы из ERROR_HANDLERS, о которых уже
+    сообщали
+    :type notified_errors: set
     """
-    tokens = {PRACTICUM_TOKEN: 'PRACTICUM_TOKEN',
-              TELEGRAM_TOKEN: 'TELEGRAM_TOKEN',
-              TELEGRAM_CHAT_ID: 'TELEGRAM_CHAT_ID'}
-    try:
-        for valid_tokens in tokens:
-            if valid_tokens and len(str(valid_tokens)) > 1:
-                pass
-            else:
-                raise TokenError(tokens[valid_tokens])
-    except TokenError as token_error:
-        logger.critical(f"Отсутствует обязательная переменная: {token_error}.")
-    else:
-        return True
+    error_type = next((error_class for error_class in type(error).__mro__
+                       if error_class in ERROR_HANDLERS), None)
+    prefix, notify = ERROR_HANDLERS.get(error_type, DEFAULT_ERROR_HANDLER)
+    message = f"{prefix} {error}"
+    logger.error(message)
+    if notify == NOTIFY_ONCE:
+        notify = error_type not in notified_errors
+        notified_errors.add(error_type)
+    if notify:
+        send_message(bot, message)
+        logger.info(f"Отправка ошибки {type(error).__name__}")
 
 
-# flake8: noqa: C901
 def main():
     """Основная логика работы бота.
 
@@ -218,8 +686,9 @@ def main():
         Запрос к API.
         Проверка ответа.
         Если есть обновления — получает статус работы из обновления и
-        отправить сообщение в Telegram.
-        Ждет некоторое время и делает новый запрос.
+        отправить сообщение в Telegram, если о нем еще не сообщали.
+        Ждет некоторое время и делает новый запрос: после обновления
+        FAST_RETRY_TIME секунд, затем пауза растет до RETRY_TIME.
     """
     if not check_tokens():
         sys.exit()
@@ -233,55 +702,29 @@ def main():
         logger.error('Ошибка инициализации Telegram', error)
         sys.exit()
 
+    load_last_status()
+    signal.signal(signal.SIGTERM, save_last_status)
+
     current_timestamp = int(time.time())
 
-    api_error = 0
+    notified_errors = set()
+    next_sleep = RETRY_TIME
 
     while True:
         try:
             response = get_api_answer(current_timestamp)
 
-            check = check_response(response)
-            if check:
-                status_homework = parse_status(check[0])
-                send_message(bot, status_homework)
-                logger.info("Сообщение с новым статусом отправлено")
+            check = check_response(response) or []
+            next_sleep = get_next_sleep(next_sleep,
+                                        send_new_statuses(bot, check,
+                                                          notified_errors))
 
-            current_timestamp = response["current_date"]
-            time.sleep(RETRY_TIME)
+            current_timestamp = response.get("current_date",
+                                             current_timestamp)
+            time.sleep(next_sleep)
 
-        except TelegramBot as telegram_bot_error:
-            logger.error("Возникла ошибка с отправкой сообщения:",
-                         telegram_bot_error)
-            time.sleep(RETRY_TIME)
-        except ParseNoneStatus as error_status:
-            message = (
-                f"Сбой в работе, недокументированный статус домашней "
-                f"работы, обнаруженный в ответе API: {error_status}"
-            )
-            logger.error(message)
-            send_message(bot, message)
-            logger.info("Отправка ошибки ParseNoneStatus")
-            time.sleep(RETRY_TIME)
-        except TokenError as error_token:
-            message = f"Отсутствие ожидаемых ключей от API: {error_token}"
-            logger.error(message)
-            send_message(bot, message)
-            logger.info("Отправка ошибки TokenError")
-            time.sleep(RETRY_TIME)
-        except ApiError as error_api:
-            message = f"Нет доступа к API: {error_api}"
-            logger.error(message)
-            if api_error == 0:
-                send_message(bot, message)
-                logger.info("Отправка ошибки ApiError")
-                api_error += 1
-            time.sleep(RETRY_TIME)
         except Exception as error:
-            message = f"Сбой в работе программы: {error}"
-            logger.error(message)
-            send_message(bot, message)
-            logger.info("Отправка непредвиденной ошибки")
+            handle_error(bot, error, notified_errors)
             time.sleep(RETRY_TIME)
         else:
             logger.debug("В ответе нет изменений")
@@ -1,6 +1,9 @@
 import os
+import queue
+from collections import OrderedDict
 from http import HTTPStatus
 
+import pytest
 import requests
 import telegram
 import utils
@@ -640,3 +643,508 @@ class TestHomework:
                 f'Убедитесь, что в функции `{func_name}` обрабатываете ситуацию, '
                 'когда API возвращает код, отличный от 200'
             )
+
+
+class MockJSONResponse:
+
+    def __init__(self, data, status_code=HTTPStatus.OK):
+        self.data = data
+        self.status_code = status_code
+
+    def json(self):
+        return self.data
+
+
+class TestApiCache:
+
+    def test_fallback_to_previous_answer(self, monkeypatch, random_timestamp):
+        import homework
+
+        monkeypatch.setattr(homework, '_CACHE', {})
+        monkeypatch.setattr(homework, 'API_RETRY_TOTAL', 0)
+        answer = {'homeworks': [], 'current_date': random_timestamp}
+        monkeypatch.setattr(requests, 'get',
+                            lambda *args, **kwargs: MockJSONResponse(answer))
+        assert homework.get_api_answer(random_timestamp - 600) == answer
+
+        def broken_get(*args, **kwargs):
+            raise requests.ConnectionError('нет сети')
+
+        monkeypatch.setattr(requests, 'get', broken_get)
+        assert homework.get_api_answer(random_timestamp) == answer, (
+            'При недоступности API для следующей метки опроса '
+            'ожидается последний сохраненный ответ'
+        )
+
+        try:
+            homework.get_api_answer(random_timestamp + 1)
+        except homework.ApiError:
+            pass
+        else:
+            assert False, (
+                'Сохраненный ответ не должен подменять ответ '
+                'для несвязанной временной метки'
+            )
+
+
+class TestApiCacheTTL:
+
+    @pytest.fixture
+    def api(self, monkeypatch, random_timestamp):
+        import homework
+
+        now = [1000.0]
+        made = []
+        answer = {'homeworks': [], 'current_date': random_timestamp}
+
+        def mock_response_get(*args, **kwargs):
+            made.append(kwargs)
+            return MockJSONResponse(answer)
+
+        monkeypatch.setattr(homework, '_CACHE', {})
+        monkeypatch.setattr(homework.time, 'monotonic', lambda: now[0])
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        return homework, answer, made, now
+
+    def test_cache_hit_skips_request(self, api, random_timestamp):
+        homework, answer, made, now = api
+        assert homework.get_api_answer(random_timestamp) == answer
+        now[0] += homework.CACHE_TTL - 1
+        assert homework.get_api_answer(random_timestamp) == answer
+        assert len(made) == 1, (
+            'Повторный запрос с той же меткой в пределах CACHE_TTL '
+            'не должен обращаться к API'
+        )
+
+    def test_expired_entry_is_fetched_again(self, api, random_timestamp):
+        homework, answer, made, now = api
+        homework.get_api_answer(random_timestamp)
+        now[0] += homework.CACHE_TTL + 1
+        assert homework.get_api_answer(random_timestamp) == answer
+        assert len(made) == 2, (
+            'После истечения CACHE_TTL ответ должен запрашиваться заново'
+        )
+
+
+class TestApiFallbackLimits:
+
+    @pytest.fixture
+    def cached(self, monkeypatch, random_timestamp):
+        import homework
+
+        now = [1000.0]
+        monkeypatch.setattr(homework, '_CACHE', {})
+        monkeypatch.setattr(homework, 'API_RETRY_TOTAL', 0)
+        monkeypatch.setattr(homework.time, 'monotonic', lambda: now[0])
+        answer = {'homeworks': [], 'current_date': random_timestamp}
+        monkeypatch.setattr(requests, 'get',
+                            lambda *args, **kwargs: MockJSONResponse(answer))
+        homework.get_api_answer(random_timestamp - 600)
+        return homework, answer, now
+
+    def set_status(self, monkeypatch, status_code):
+        monkeypatch.setattr(
+            requests, 'get',
+            lambda *args, **kwargs: MockJSONResponse({}, status_code)
+        )
+
+    @pytest.mark.parametrize('status_code', [
+        HTTPStatus.UNAUTHORIZED, HTTPStatus.NOT_FOUND,
+    ])
+    def test_fatal_status_is_not_hidden(self, monkeypatch, cached,
+                                        random_timestamp, status_code):
+        homework, _, _ = cached
+        self.set_status(monkeypatch, status_code)
+        for _ in range(3):
+            try:
+                homework.get_api_answer(random_timestamp)
+            except homework.ApiError:
+                pass
+            else:
+                assert False, (
+                    f'Ответ {status_code} должен приводить к ApiError, '
+                    'даже если есть сохраненный ответ'
+                )
+
+    def test_transient_status_uses_fallback(self, monkeypatch, cached,
+                                            random_timestamp):
+        homework, answer, _ = cached
+        self.set_status(monkeypatch, HTTPStatus.SERVICE_UNAVAILABLE)
+        assert homework.get_api_answer(random_timestamp) == answer
+
+    def test_fallback_expires(self, monkeypatch, cached, random_timestamp):
+        homework, _, now = cached
+        self.set_status(monkeypatch, HTTPStatus.SERVICE_UNAVAILABLE)
+        now[0] += homework.CACHE_MAX_AGE + 1
+        try:
+            homework.get_api_answer(random_timestamp)
+        except homework.ApiUnavailable:
+            pass
+        else:
+            assert False, (
+                'Ответ старше CACHE_MAX_AGE не должен подменять ошибку API'
+            )
+
+
+class TestNextSleep:
+
+    def test_fast_retry_after_update(self):
+        import homework
+
+        assert homework.get_next_sleep(
+            homework.RETRY_TIME, True) == homework.FAST_RETRY_TIME
+
+    def test_backoff_growth_is_capped(self):
+        import homework
+
+        sleep = homework.get_next_sleep(homework.FAST_RETRY_TIME, False)
+        assert sleep == homework.FAST_RETRY_TIME * homework.RETRY_BACKOFF
+        for _ in range(20):
+            sleep = homework.get_next_sleep(sleep, False)
+        assert sleep == homework.RETRY_TIME
+
+
+class MockFailingBot:
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+
+    def send_message(self, chat_id=None, text=None, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise telegram.error.NetworkError('сбой сети')
+        self.sent.append(text)
+
+
+class MockAliveThread:
+
+    def is_alive(self):
+        return True
+
+
+class TestSendQueue:
+
+    def test_split_batch_joins_messages(self):
+        import homework
+
+        assert homework._split_batch(['a', 'b']) == [['a', 'b']]
+
+    def test_split_batch_respects_max_length(self):
+        import homework
+
+        limit = homework.MESSAGE_MAX_LENGTH
+        separator = len(homework.BATCH_SEPARATOR)
+        first = 'x' * (limit // 2)
+        fits = 'y' * (limit - len(first) - separator)
+        assert homework._split_batch([first, fits]) == [[first, fits]]
+        assert homework._split_batch([first, fits + 'y']) == [
+            [first], [fits + 'y']
+        ]
+
+    def test_oversized_message_is_queued_in_chunks(self, status_state,
+                                                   monkeypatch):
+        homework = status_state
+        monkeypatch.setattr(homework, '_OUT_Q', queue.Queue())
+        monkeypatch.setattr(homework, '_sender', MockAliveThread())
+        limit = homework.MESSAGE_MAX_LENGTH
+        oversized = 'z' * (limit * 2 + 10)
+
+        homework.queue_message(None, oversized, ('hw123', 'approved'))
+        items = [homework._OUT_Q.get_nowait() for _ in range(3)]
+        assert [len(chunk) for chunk, _ in items] == [limit, limit, 10]
+        assert [reported for _, reported in items] == [
+            None, None, ('hw123', 'approved')
+        ], 'Статус должен отмечаться после доставки последней части'
+
+    def test_send_chunk_retries(self, monkeypatch):
+        import homework
+
+        delays = []
+        monkeypatch.setattr(homework.time, 'sleep', delays.append)
+        bot = MockFailingBot(failures=homework.SEND_RETRY_TOTAL)
+        assert homework._send_chunk(bot, 'text')
+        assert bot.sent == ['text']
+        assert len(delays) == homework.SEND_RETRY_TOTAL
+
+        bot = MockFailingBot(failures=homework.SEND_RETRY_TOTAL + 1)
+        assert not homework._send_chunk(bot, 'text'), (
+            'После исчерпания повторов отправка должна считаться неудачной'
+        )
+
+    def test_failed_group_resumes_without_resending(self, status_state,
+                                                    monkeypatch):
+        homework = status_state
+        monkeypatch.setattr(homework.time, 'sleep', lambda delay: None)
+        monkeypatch.setattr(homework, '_OUT_Q', queue.Queue())
+        limit = homework.MESSAGE_MAX_LENGTH
+        items = [('a' * limit, None), ('b' * limit, None),
+                 ('c', ('hw123', 'approved'))]
+        for item in items:
+            homework._OUT_Q.put_nowait(item)
+
+        class FailSecondBot(MockFailingBot):
+            failed = False
+
+            def send_message(self, chat_id=None, text=None, **kwargs):
+                if text.startswith('b') and not self.failed:
+                    self.failed = True
+                    raise telegram.error.NetworkError('сбой сети')
+                self.sent.append(text)
+
+        monkeypatch.setattr(homework, 'SEND_RETRY_TOTAL', 0)
+        bot = FailSecondBot()
+        unsent = homework._send_items(bot, items)
+        assert unsent == items[1:], (
+            'Неотправленная пачка и все следующие должны остаться в работе'
+        )
+        assert 'hw123' not in homework._LAST_STATUS
+
+        assert homework._send_items(bot, unsent) == []
+        assert [text[0] for text in bot.sent] == ['a', 'b', 'c'], (
+            'Уже доставленные части не должны отправляться повторно'
+        )
+        assert homework._LAST_STATUS == {'hw123': 'approved'}
+        assert homework._OUT_Q.unfinished_tasks == 0
+
+    def test_full_queue_raises_telegram_error(self, monkeypatch):
+        import homework
+
+        monkeypatch.setattr(homework, '_OUT_Q', queue.Queue(maxsize=1))
+        monkeypatch.setattr(homework, '_sender', MockAliveThread())
+        homework.send_message(MockFailingBot(), 'first')
+        try:
+            homework.send_message(MockFailingBot(), 'second')
+        except homework.TelegramBot:
+            pass
+        else:
+            assert False, (
+                'При переполненной очереди send_message должна '
+                'выбрасывать TelegramBot'
+            )
+
+
+@pytest.fixture
+def status_state(monkeypatch, tmp_path):
+    import homework
+
+    monkeypatch.setattr(homework, '_LAST_STATUS', OrderedDict())
+    monkeypatch.setattr(homework, '_PENDING_STATUS', set())
+    monkeypatch.setattr(homework, 'LAST_STATUS_FILE',
+                        str(tmp_path / 'last_status.json'))
+    return homework
+
+
+class TestLastStatus:
+
+    def test_duplicate_status_is_skipped(self, status_state):
+        homework = status_state
+        hw = {'homework_name': 'hw123', 'status': 'approved'}
+
+        assert homework.is_new_status(hw)
+        homework.mark_reported(('hw123', 'approved'))
+        assert not homework.is_new_status(hw), (
+            'Уже отправленный статус не должен считаться новым'
+        )
+        assert homework.is_new_status({'homework_name': 'hw123',
+                                       'status': 'rejected'})
+
+    def test_pending_status_is_skipped(self, status_state, monkeypatch):
+        homework = status_state
+        monkeypatch.setattr(homework, '_OUT_Q', queue.Queue())
+        monkeypatch.setattr(homework, '_sender', MockAliveThread())
+        hw = {'homework_name': 'hw123', 'status': 'approved'}
+
+        homework.queue_message(None, 'text', ('hw123', 'approved'))
+        assert not homework.is_new_status(hw), (
+            'Статус, ожидающий отправки, не должен попадать в очередь снова'
+        )
+        assert 'hw123' not in homework._LAST_STATUS, (
+            'Статус должен отмечаться сообщенным только после доставки'
+        )
+
+    def test_eviction_at_max_size(self, status_state, monkeypatch):
+        homework = status_state
+        monkeypatch.setattr(homework, 'LAST_STATUS_MAX_SIZE', 2)
+
+        homework.mark_reported(('first', 'approved'))
+        homework.mark_reported(('second', 'approved'))
+        homework.mark_reported(('third', 'approved'))
+        assert list(homework._LAST_STATUS) == ['second', 'third']
+
+    def test_save_and_load_round_trip(self, status_state):
+        homework = status_state
+        homework.mark_reported(('hw123', 'reviewing'))
+        homework.save_last_status()
+
+        homework._LAST_STATUS.clear()
+        homework.load_last_status()
+        assert homework._LAST_STATUS == {'hw123': 'reviewing'}
+
+    def test_save_uses_snapshot(self, status_state, monkeypatch):
+        homework = status_state
+        homework.mark_reported(('hw123', 'approved'))
+        dumped = []
+
+        def mutating_dump(data, *args, **kwargs):
+            homework.mark_reported(('hw456', 'rejected'))
+            dumped.append(dict(data))
+
+        monkeypatch.setattr(homework.json, 'dump', mutating_dump)
+        homework.save_last_status()
+        assert dumped == [{'hw123': 'approved'}], (
+            'В файл должна записываться копия статусов, а не сам словарь'
+        )
+
+    def test_save_with_held_lock(self, status_state, monkeypatch):
+        homework = status_state
+        monkeypatch.setattr(homework, 'STATUS_LOCK_TIMEOUT', 0.01)
+        homework.mark_reported(('hw123', 'approved'))
+
+        with homework._STATUS_LOCK:
+            homework.save_last_status()
+        homework._LAST_STATUS.clear()
+        homework.load_last_status()
+        assert homework._LAST_STATUS == {'hw123': 'approved'}
+
+    def test_load_corrupt_file(self, status_state):
+        homework = status_state
+        with open(homework.LAST_STATUS_FILE, 'w', encoding='UTF-8') as file:
+            file.write('{не json')
+
+        homework.load_last_status()
+        assert homework._LAST_STATUS == {}
+
+    def test_parse_error_does_not_block_other_homeworks(self, status_state,
+                                                        monkeypatch):
+        homework = status_state
+        queued = []
+        monkeypatch.setattr(homework, 'queue_message',
+                            lambda bot, message, reported=None:
+                            queued.append(message))
+        homeworks = [
+            {'homework_name': 'bad', 'status': 'unknown'},
+            {'status': 'approved'},
+            {'homework_name': 'good', 'status': 'approved'},
+        ]
+
+        assert homework.send_new_statuses(None, homeworks, set())
+        assert len(queued) == 3
+        assert queued[-1].startswith(
+            'Изменился статус проверки работы "good"'
+        )
+
+
+class TestApiRetry:
+
+    @pytest.fixture
+    def delays(self, monkeypatch):
+        import homework
+
+        delays = []
+        monkeypatch.setattr(homework.time, 'sleep', delays.append)
+        monkeypatch.setattr(homework, 'API_RETRY_BACKOFF', 0.5)
+        return delays
+
+    def mock_get(self, monkeypatch, outcomes):
+        made = []
+
+        def mock_response_get(*args, **kwargs):
+            outcome = outcomes[min(len(made), len(outcomes) - 1)]
+            made.append(kwargs)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return MockJSONResponse({}, status_code=outcome)
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+        return made
+
+    def test_retry_until_success(self, monkeypatch, delays):
+        import homework
+
+        made = self.mock_get(monkeypatch, [
+            HTTPStatus.SERVICE_UNAVAILABLE, HTTPStatus.BAD_GATEWAY,
+            HTTPStatus.GATEWAY_TIMEOUT, HTTPStatus.OK,
+        ])
+        response = homework._get_with_retry({'from_date': 0})
+        assert response.status_code == HTTPStatus.OK
+        assert len(made) == homework.API_RETRY_TOTAL + 1
+        assert delays == [0.5, 1.0, 2.0]
+
+    def test_no_retry_for_other_statuses(self, monkeypatch, delays):
+        import homework
+
+        made = self.mock_get(monkeypatch, [HTTPStatus.NOT_FOUND])
+        response = homework._get_with_retry({'from_date': 0})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert len(made) == 1
+        assert delays == []
+
+    def test_last_attempt_status_is_returned(self, monkeypatch, delays):
+        import homework
+
+        made = self.mock_get(monkeypatch, [HTTPStatus.INTERNAL_SERVER_ERROR])
+        response = homework._get_with_retry({'from_date': 0})
+        assert response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+        assert len(made) == homework.API_RETRY_TOTAL + 1
+
+    def test_last_attempt_error_is_raised(self, monkeypatch, delays):
+        import homework
+
+        made = self.mock_get(monkeypatch, [requests.Timeout('тайм-аут')])
+        try:
+            homework._get_with_retry({'from_date': 0})
+        except requests.Timeout:
+            pass
+        else:
+            assert False, (
+                'После последней попытки ошибка соединения '
+                'должна выбрасываться дальше'
+            )
+        assert len(made) == homework.API_RETRY_TOTAL + 1
+
+
+class TestHandleError:
+
+    @pytest.fixture
+    def sent(self, monkeypatch):
+        import homework
+
+        messages = []
+        monkeypatch.setattr(homework, 'send_message',
+                            lambda bot, message: messages.append(message))
+        return messages
+
+    def test_routing_table(self, sent):
+        import homework
+
+        homework.handle_error(None, homework.TokenError('homeworks'), set())
+        homework.handle_error(None, homework.TelegramBot('сбой'), set())
+        assert sent == ['Отсутствие ожидаемых ключей от API: homeworks']
+
+    def test_notify_once(self, sent):
+        import homework
+
+        notified = set()
+        homework.handle_error(None, homework.ApiError('первая'), notified)
+        homework.handle_error(None, homework.ApiError('вторая'), notified)
+        assert sent == ['Нет доступа к API: первая']
+
+    def test_default_handler(self, sent):
+        import homework
+
+        homework.handle_error(None, ValueError('что-то'), set())
+        assert sent == ['Сбой в работе программы: что-то']
+
+    def test_subclass_uses_base_handler(self, sent):
+        import homework
+
+        class ApiTimeout(homework.ApiError):
+            pass
+
+        notified = set()
+        homework.handle_error(None, homework.ApiError('первая'), notified)
+        homework.handle_error(None, ApiTimeout('вторая'), notified)
+        assert sent == ['Нет доступа к API: первая'], (
+            'Подкласс ApiError должен обрабатываться правилом ApiError'
+        )